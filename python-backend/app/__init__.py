@@ -1,8 +1,21 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import get_settings
+from app.middleware.admission import setup_admission
 from app.middleware.cors import setup_cors
-from app.api.routes import health, chat, stats
+from app.middleware.profiling import setup_profiling
+from app.middleware.request_context import setup_request_context
+from app.api.routes import health, chat, stats, admin
 from app.core.logging_config import logger
+from app.services.vector_store import get_vector_store
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build slow-to-start services before the first request arrives"""
+    # The vector store may download and warm up the local embedding model
+    await asyncio.to_thread(get_vector_store)
+    yield
 
 def create_app() -> FastAPI:
     """Application factory"""
@@ -11,16 +24,21 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         version=settings.version,
-        description="Multimodal Chat API with AI capabilities"
+        description="Multimodal Chat API with AI capabilities",
+        lifespan=lifespan
     )
     
-    # Setup middleware
+    # Setup middleware, the first added runs innermost so rejections still get CORS headers
+    setup_admission(app)
     setup_cors(app)
+    setup_profiling(app)
+    setup_request_context(app)
     
     # Include routers
     app.include_router(health.router, tags=["health"])
     app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
     app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
+    app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
     
     logger.info("🎬 Multimodal Chat API application created successfully")
     
@@ -1,9 +1,14 @@
-from fastapi import Depends, HTTPException
+import hmac
+from typing import Optional
+from fastapi import HTTPException, Header
 from app.services.api_key_manager import get_api_key_manager, APIKeyManager
 from app.services.gemini_service import get_gemini_service, GeminiService
 from app.services.video_processor import get_video_processor, VideoProcessor
 from app.services.vector_store import get_vector_store, VectorStoreService
+from app.services.admission_controller import get_admission_controller, AdmissionController
 from app.utils.cache import get_cache, InMemoryCache
+from app.utils.profiling import get_profile_store, ProfileStore
+from app.core.config import get_settings
 
 def get_api_key_manager_dep() -> APIKeyManager:
     """Dependency to get API key manager"""
@@ -23,13 +28,26 @@ def get_video_processor_dep() -> VideoProcessor:
     """Dependency to get video processor"""
     return get_video_processor()
 
-def get_vector_store_dep() -> VectorStoreService:
-    """Dependency to get vector store"""
-    store = get_vector_store()
-    if store is None:
-        raise HTTPException(status_code=500, detail="Vector store unavailable")
-    return store
+def get_vector_store_dep() -> Optional[VectorStoreService]:
+    """Dependency to get vector store, None while it is unavailable"""
+    return get_vector_store()
 
 def get_cache_dep() -> InMemoryCache:
     """Dependency to get cache"""
-    return get_cache()
\ No newline at end of file
+    return get_cache()
+
+def get_admission_controller_dep() -> AdmissionController:
+    """Dependency to get admission controller"""
+    return get_admission_controller()
+
+def get_profile_store_dep() -> ProfileStore:
+    """Dependency to get profile store"""
+    return get_profile_store()
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Dependency that guards admin endpoints behind the configured admin token"""
+    settings = get_settings()
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.api.dependencies import get_profile_store_dep, require_admin_token
+from app.utils.profiling import ProfileStore
+from app.core.logging_config import logger
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+@router.get("/profiles")
+def list_profiles(profile_store: ProfileStore = Depends(get_profile_store_dep)) -> List[Dict[str, Any]]:
+    """List stored request profiles"""
+    logger.info("🔬 Profile list requested")
+    return profile_store.list_profiles()
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, profile_store: ProfileStore = Depends(get_profile_store_dep)):
+    """Download a stored request profile"""
+    path = profile_store.get_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
@@ -14,6 +14,7 @@ from app.services.gemini_service import GeminiService
 from app.services.video_processor import VideoProcessor
 from app.services.vector_store import VectorStoreService
 from app.utils.cache import InMemoryCache
+from app.utils.profiling import profile_span, track_background_task
 from app.core.logging_config import logger
 
 router = APIRouter()
@@ -25,17 +26,17 @@ async def unified_chat(
     session_id: Optional[str] = Form(...),
     gemini_service: GeminiService = Depends(get_gemini_service_dep),
     video_processor: VideoProcessor = Depends(get_video_processor_dep),
-    vector_store: VectorStoreService = Depends(get_vector_store_dep),
+    vector_store: Optional[VectorStoreService] = Depends(get_vector_store_dep),
     cache: InMemoryCache = Depends(get_cache_dep)
 ):
     """Main multimodal chat endpoint"""
     start_time = time.time()
-    logger.info(f"🚀 New inference request - Session: {session_id}, Has video: {video_file is not None}")
+    logger.info("🚀 New inference request - Session: %s, Has video: %s", session_id, video_file is not None)
     
     # Generate session ID if not provided
     if not session_id:
         session_id = str(uuid.uuid4())
-        logger.info(f"🆔 Generated new session ID: {session_id}")
+        logger.info("🆔 Generated new session ID: %s", session_id)
 
     # Check cache first
     cache_key = f"{session_id}_{hash(prompt) % 10000}"
@@ -45,25 +46,37 @@ async def unified_chat(
     if cached_context:
         logger.debug("⚡ Context retrieved from cache")
         context_history = cached_context
+    elif vector_store is None:
+        logger.warning("⚠️ Vector store unavailable, answering without chat history")
+        context_history = ""
     else:
         logger.info("🧠 Retrieving context from vector store...")
-        context_history = await vector_store.get_context_history(prompt, session_id)
+        with profile_span("context_retrieval"):
+            context_history = await vector_store.get_context_history(prompt, session_id)
         cache.set(cache_key, context_history)
     
     # Process video if provided
     frames = []
     if video_file:
-        logger.info(f"🎬 Processing multimodal input: {video_file.filename}")
+        logger.info("🎬 Processing multimodal input: %s", video_file.filename)
         try:
-            video_content = await video_file.read()
-            frames = video_processor.extract_frames_optimized(video_content)
+            with profile_span("upload_read"):
+                video_content = await video_file.read()
+            with profile_span("frame_extraction"):
+                # Decoding is CPU bound, keep it off the event loop thread
+                loop = asyncio.get_event_loop()
+                frames = await loop.run_in_executor(
+                    None,
+                    video_processor.extract_frames_optimized,
+                    video_content
+                )
             
             if not frames:
                 raise HTTPException(status_code=400, detail="Could not extract frames from video.")
             
-            logger.info(f"✅ Successfully extracted {len(frames)} frames")
+            logger.info("✅ Successfully extracted %s frames", len(frames))
         except Exception as e:
-            logger.error(f"❌ Video processing error: {e}")
+            logger.error("❌ Video processing error: %s", e)
             raise HTTPException(status_code=400, detail=f"Video processing failed: {e}")
     
     # Optimize context length
@@ -78,17 +91,21 @@ async def unified_chat(
     try:
         logger.info("🤖 Generating AI response...")
         # Generate response using Gemini service
-        ai_response = await gemini_service.generate_with_retry(content)
+        with profile_span("generation"):
+            ai_response = await gemini_service.generate_with_retry(content)
         
         # Store conversation history asynchronously
-        asyncio.create_task(vector_store.store_chat_history(prompt, ai_response, session_id))
+        if vector_store is not None:
+            track_background_task(
+                asyncio.create_task(vector_store.store_chat_history(prompt, ai_response, session_id))
+            )
 
         processing_time = time.time() - start_time
-        logger.info(f"🎉 Request completed successfully in {processing_time:.2f}s - Session: {session_id}")
+        logger.info("🎉 Request completed successfully in %.2fs - Session: %s", processing_time, session_id)
         
         return PlainTextResponse(content=ai_response)
     
     except Exception as e:
         processing_time = time.time() - start_time
-        logger.error(f"❌ Request failed after {processing_time:.2f}s - Error: {e}")
+        logger.error("❌ Request failed after %.2fs - Error: %s", processing_time, e)
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {e}")
\ No newline at end of file
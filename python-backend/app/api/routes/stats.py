@@ -1,16 +1,25 @@
 from fastapi import APIRouter, Depends
 from app.models.schemas import StatsResponse
-from app.api.dependencies import get_api_key_manager_dep, get_cache_dep
+from app.api.dependencies import (
+    get_api_key_manager_dep,
+    get_cache_dep,
+    get_admission_controller_dep,
+    get_gemini_service_dep
+)
 from app.services.api_key_manager import APIKeyManager
+from app.services.admission_controller import AdmissionController
+from app.services.gemini_service import GeminiService
 from app.utils.cache import InMemoryCache
-from app.core.logging_config import logger
+from app.core.logging_config import logger, get_dropped_log_count
 
 router = APIRouter()
 
 @router.get("/stats", response_model=StatsResponse)
 def get_api_stats(
     api_key_manager: APIKeyManager = Depends(get_api_key_manager_dep),
-    cache: InMemoryCache = Depends(get_cache_dep)
+    cache: InMemoryCache = Depends(get_cache_dep),
+    admission_controller: AdmissionController = Depends(get_admission_controller_dep),
+    gemini_service: GeminiService = Depends(get_gemini_service_dep)
 ):
     """Get API statistics"""
     logger.info("📊 API stats requested")
@@ -18,5 +27,8 @@ def get_api_stats(
     stats = api_key_manager.get_stats()
     return StatsResponse(
         api_key_stats=stats,
-        cache_size=cache.size()
+        cache_size=cache.size(),
+        admission_stats=admission_controller.get_stats(),
+        generation_stats=gemini_service.get_stats(),
+        log_records_dropped=get_dropped_log_count()
     )
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from dotenv import load_dotenv
@@ -16,6 +17,11 @@ class Settings(BaseSettings):
     
     # Database settings
     chroma_db_path: str = "./chroma_db"
+    # "google" embeds remotely with the Gemini key, "local" runs MiniLM in-process on CPU
+    embedding_backend: str = "google"
+    embedding_batch_size: int = 64
+    # Directory holding the local MiniLM ONNX model, defaults to chromadb's download cache
+    local_embedding_model_path: Optional[str] = None
     
     # API Keys
     gemini_api_key: str = Field(..., env="GEMINI_API_KEY")
@@ -25,6 +31,49 @@ class Settings(BaseSettings):
     cache_size_limit: int = 100
     max_frames: int = 5
     target_fps: int = 1
+    image_passthrough_max_bytes: int = 512 * 1024
+    
+    # Admission control settings
+    video_max_concurrency: int = 2
+    video_max_queue: int = 4
+    video_request_timeout: float = 120.0
+    text_max_concurrency: int = 8
+    text_max_queue: int = 32
+    text_request_timeout: float = 30.0
+    admission_retry_after: int = 5
+    admission_paths: list = ["/api/v1/infer"]
+    # Requests are classified before their body is read, bodies this large count as video uploads
+    admission_video_min_bytes: int = 64 * 1024
+    
+    # Generation hedging and circuit breaker settings
+    hedging_enabled: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_initial_delay: float = 8.0
+    hedge_min_delay: float = 1.0
+    circuit_failure_threshold: int = 3
+    circuit_slow_call_seconds: float = 20.0
+    circuit_reset_seconds: float = 30.0
+    
+    # Profiling settings
+    admin_token: Optional[str] = None
+    profiling_paths: list = ["/api/v1/infer"]
+    profiling_header: str = "X-Profile"
+    profiling_sample_rate: float = 0.0
+    profiling_slow_threshold: float = 10.0
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 50
+    profiling_background_timeout: float = 30.0
+    
+    # Logging settings
+    log_level: str = "INFO"
+    log_file: str = "chat_api.log"
+    log_json: bool = False
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_queue_size: int = 10000
+    # Fraction of records kept per route, 0 suppresses the route entirely
+    log_route_sample_rates: dict = {"/": 0.0, "/health": 0.0}
     
     # CORS settings
     # after
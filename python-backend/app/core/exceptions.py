@@ -12,4 +12,12 @@ class VectorStoreError(Exception):
 
 class GeminiServiceError(Exception):
     """Gemini service related errors"""
-    pass
\ No newline at end of file
+    pass
+
+class AdmissionRejectedError(Exception):
+    """Request rejected by admission control"""
+    
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
\ No newline at end of file
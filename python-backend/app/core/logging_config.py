@@ -1,17 +1,149 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
-from pathlib import Path
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+from app.core.config import get_settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Path of the request being handled, set per request by RequestContextMiddleware
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+# Whether the current request's records below WARNING are kept, decided once per request
+request_logs_sampled: ContextVar[Optional[bool]] = ContextVar("request_logs_sampled", default=None)
+
+# Attributes every LogRecord carries, anything else was passed through `extra`.
+# uvicorn's color_message is an ANSI-coloured copy of the message, not context
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color_message"}
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def sample_route(route: Optional[str], sample_rates: Dict[str, float]) -> bool:
+    """Decide whether to keep logs for a route, routes without a rate are always kept"""
+    rate = sample_rates.get(route)
+    if rate is None:
+        return True
+    return rate > 0 and random.random() < rate
+
+class RouteSamplingFilter(logging.Filter):
+    """Sample or suppress low-severity log records for high-frequency routes"""
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    @staticmethod
+    def _route_of(record: logging.LogRecord) -> Optional[str]:
+        route = getattr(record, "route", None) or current_route.get()
+        if route is None and record.name == "uvicorn.access" and isinstance(record.args, tuple) and len(record.args) >= 3:
+            # uvicorn access records carry (client, method, path, http_version, status)
+            route = str(record.args[2]).split("?", 1)[0]
+        return route
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Warnings and errors are never sampled away
+        if record.levelno >= logging.WARNING:
+            return True
+        # Inside a request, keep or drop all of its records together
+        sampled = request_logs_sampled.get()
+        if sampled is not None:
+            return sampled
+        return sample_route(self._route_of(record), self.sample_rates)
+
+class AsyncQueueHandler(QueueHandler):
+    """Queue handler that defers formatting to the listener thread and drops when full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_count = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in-process, so the record can cross the queue unformatted
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_count += 1
+
+# Background writer and its queue handler, started by setup_logging
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[AsyncQueueHandler] = None
 
 def setup_logging():
-    """Setup application logging"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('chat_api.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
+    """Setup application logging with a background writer thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    settings = get_settings()
+    formatter = JsonFormatter() if settings.log_json else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = RotatingFileHandler(
+        settings.log_file,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count,
+        encoding="utf-8"
     )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = AsyncQueueHandler(log_queue)
+    queue_handler.addFilter(RouteSamplingFilter(settings.log_route_sample_rates))
+    _queue_handler = queue_handler
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(settings.log_level.upper())
+
+    # Let uvicorn records flow through the same pipeline
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        dropped_count = get_dropped_log_count()
+        if dropped_count:
+            logger.warning("⚠️ %s log records were dropped because the log queue was full", dropped_count)
+        _listener.stop()
+        _listener = None
+
+def get_dropped_log_count() -> int:
+    """Number of records dropped because the log queue was full"""
+    return _queue_handler.dropped_count if _queue_handler is not None else 0
 
 # Global logger instance
-logger = logging.getLogger(__name__)
\ No newline at end of file
+logger = logging.getLogger(__name__)
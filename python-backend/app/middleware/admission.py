@@ -0,0 +1,52 @@
+from typing import Optional
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.core.config import Settings, get_settings
+from app.core.exceptions import AdmissionRejectedError
+from app.services.admission_controller import AdmissionController, get_admission_controller
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits or rejects inference requests before their body is read"""
+
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.settings = settings
+        self.admission_paths = set(settings.admission_paths)
+
+    def _classify(self, scope) -> str:
+        """Pick the request class from headers alone, the upload has not been received yet"""
+        content_length: Optional[int] = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    pass
+                break
+        # Text-only forms are small, a large or unsized (chunked) body is treated as an upload
+        if content_length is None or content_length >= self.settings.admission_video_min_bytes:
+            return AdmissionController.VIDEO
+        return AdmissionController.TEXT
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.admission_paths:
+            await self.app(scope, receive, send)
+            return
+
+        admission_controller = get_admission_controller()
+        try:
+            async with admission_controller.admit(self._classify(scope)):
+                await self.app(scope, receive, send)
+        except AdmissionRejectedError as e:
+            # Answer without reading the body, the server discards whatever the client still sends
+            response = JSONResponse(
+                status_code=e.status_code,
+                content={"detail": str(e)},
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+
+def setup_admission(app: FastAPI):
+    """Setup admission control for inference endpoints"""
+    settings = get_settings()
+    app.add_middleware(AdmissionMiddleware, settings=settings)
@@ -0,0 +1,85 @@
+import asyncio
+import hmac
+import random
+from typing import Optional, Set
+from fastapi import FastAPI
+from app.core.config import Settings, get_settings
+from app.core.logging_config import logger
+from app.utils.profiling import RequestProfile, get_profile_store
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles sampled or explicitly requested requests"""
+
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.settings = settings
+        self.profiled_paths = set(settings.profiling_paths)
+        self.header_name = settings.profiling_header.lower().encode("latin-1")
+        self.admin_token = settings.admin_token.encode() if settings.admin_token else None
+        # Keeps finishing tasks referenced until their profiles are saved
+        self.finishing: Set[asyncio.Task] = set()
+
+    def _is_forced(self, scope) -> bool:
+        """Explicit profiling requires the admin token so clients cannot switch it on"""
+        if self.admin_token is None:
+            return False
+        header_value: Optional[bytes] = None
+        for name, value in scope.get("headers", []):
+            if name == self.header_name:
+                header_value = value
+                break
+        return header_value is not None and hmac.compare_digest(header_value, self.admin_token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.profiled_paths:
+            await self.app(scope, receive, send)
+            return
+
+        forced = self._is_forced(scope)
+        sample_rate = self.settings.profiling_sample_rate
+        sampled = sample_rate > 0 and random.random() < sample_rate
+        if not forced and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], forced)
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Forced profiles are always saved, so the id can be handed out up front
+                if forced:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile.profile_id.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop(status_code)
+            task = asyncio.create_task(self._finish(profile))
+            self.finishing.add(task)
+            task.add_done_callback(self.finishing.discard)
+
+    async def _finish(self, profile: RequestProfile):
+        """Wait for the request's background work, then save the profile if it qualifies"""
+        if not profile.forced and profile.duration < self.settings.profiling_slow_threshold:
+            return
+        try:
+            await profile.wait_for_background(self.settings.profiling_background_timeout)
+            await asyncio.to_thread(get_profile_store().save, profile)
+        except Exception as e:
+            logger.error("❌ Failed to save request profile: %s", e)
+
+def setup_profiling(app: FastAPI):
+    """Setup opt-in per-request profiling middleware"""
+    settings = get_settings()
+    # Without a token or a sample rate nothing can be profiled, so skip the middleware entirely
+    if not settings.admin_token and settings.profiling_sample_rate <= 0:
+        return
+
+    app.add_middleware(ProfilingMiddleware, settings=settings)
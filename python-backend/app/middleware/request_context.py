@@ -0,0 +1,31 @@
+from typing import Dict
+from fastapi import FastAPI
+from app.core.config import get_settings
+from app.core.logging_config import current_route, request_logs_sampled, sample_route
+
+class RequestContextMiddleware:
+    """ASGI middleware that exposes the request path and its log sampling decision to log filters"""
+
+    def __init__(self, app, sample_rates: Dict[str, float]):
+        self.app = app
+        self.sample_rates = sample_rates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        route_token = current_route.set(path)
+        # Sample whole requests so kept requests are logged end to end
+        sampled_token = request_logs_sampled.set(sample_route(path, self.sample_rates))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_logs_sampled.reset(sampled_token)
+            current_route.reset(route_token)
+
+def setup_request_context(app: FastAPI):
+    """Setup per-request logging context middleware"""
+    settings = get_settings()
+    app.add_middleware(RequestContextMiddleware, sample_rates=settings.log_route_sample_rates)
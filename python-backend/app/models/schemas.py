@@ -20,4 +20,7 @@ class HealthResponse(BaseModel):
 class StatsResponse(BaseModel):
     """Stats response model"""
     api_key_stats: Dict[str, Any]
-    cache_size: int
\ No newline at end of file
+    cache_size: int
+    admission_stats: Dict[str, Any] = {}
+    generation_stats: Dict[str, Any] = {}
+    log_records_dropped: int = 0
\ No newline at end of file
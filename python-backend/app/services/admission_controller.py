@@ -0,0 +1,172 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from app.core.config import get_settings
+from app.core.logging_config import logger
+from app.core.exceptions import AdmissionRejectedError
+
+class RequestClassLimiter:
+    """Concurrency limit and bounded, deadline-aware FIFO queue for one request class"""
+
+    # Weight of the newest sample in the service time moving average
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.avg_service_time: Optional[float] = None
+        self.admitted_count = 0
+        self.rejected_count = 0
+        self.shed_count = 0
+
+    def _estimated_wait(self, position: int) -> float:
+        """Estimate how long a request at the given queue position waits for a slot"""
+        if self.avg_service_time is None:
+            return 0.0
+        return math.ceil(position / self.max_concurrency) * self.avg_service_time
+
+    def _retry_after_hint(self) -> int:
+        """Seconds a rejected client should wait before retrying"""
+        estimate = self._estimated_wait(len(self.waiters) + 1)
+        return max(self.retry_after, math.ceil(estimate))
+
+    async def acquire(self, deadline: float):
+        """Wait for a free slot, rejecting requests that cannot be served in time"""
+        if self.in_flight < self.max_concurrency and not self.waiters:
+            self.in_flight += 1
+            self.admitted_count += 1
+            return
+
+        if len(self.waiters) >= self.max_queue:
+            self.rejected_count += 1
+            raise AdmissionRejectedError(
+                f"Too many {self.name} requests in flight",
+                status_code=429,
+                retry_after=self._retry_after_hint()
+            )
+
+        # A queued request must both get a slot and finish before its deadline
+        service_time = self.avg_service_time or 0.0
+        max_wait = deadline - time.monotonic() - service_time
+        if max_wait <= 0 or self._estimated_wait(len(self.waiters) + 1) >= max_wait:
+            self.shed_count += 1
+            raise AdmissionRejectedError(
+                f"{self.name.capitalize()} request would exceed its deadline while queued",
+                status_code=503,
+                retry_after=self._retry_after_hint()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up, pass it on
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.shed_count += 1
+                raise AdmissionRejectedError(
+                    f"{self.name.capitalize()} request timed out while queued",
+                    status_code=503,
+                    retry_after=self._retry_after_hint()
+                )
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+        self.admitted_count += 1
+
+    def release(self, service_time: Optional[float] = None):
+        """Free a slot, handing it directly to the oldest live waiter"""
+        if service_time is not None:
+            if self.avg_service_time is None:
+                self.avg_service_time = service_time
+            else:
+                self.avg_service_time += self.EWMA_ALPHA * (service_time - self.avg_service_time)
+
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def get_stats(self) -> Dict:
+        """Get limiter statistics"""
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_time": self.avg_service_time,
+            "admitted": self.admitted_count,
+            "rejected": self.rejected_count,
+            "shed": self.shed_count
+        }
+
+class AdmissionController:
+    """Per-class admission control and load shedding for inference requests"""
+
+    VIDEO = "video"
+    TEXT = "text"
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.limiters: Dict[str, RequestClassLimiter] = {
+            self.VIDEO: RequestClassLimiter(
+                self.VIDEO,
+                self.settings.video_max_concurrency,
+                self.settings.video_max_queue,
+                self.settings.video_request_timeout,
+                self.settings.admission_retry_after
+            ),
+            self.TEXT: RequestClassLimiter(
+                self.TEXT,
+                self.settings.text_max_concurrency,
+                self.settings.text_max_queue,
+                self.settings.text_request_timeout,
+                self.settings.admission_retry_after
+            ),
+        }
+
+    @asynccontextmanager
+    async def admit(self, request_class: str):
+        """Hold a slot of the given class for the duration of the block"""
+        limiter = self.limiters[request_class]
+        start_time = time.monotonic()
+
+        try:
+            await limiter.acquire(start_time + limiter.timeout)
+        except AdmissionRejectedError as e:
+            logger.warning("🚦 Rejected %s request (%s): %s", request_class, e.status_code, e)
+            raise
+
+        admitted_time = time.monotonic()
+        try:
+            yield
+        finally:
+            limiter.release(time.monotonic() - admitted_time)
+
+    def get_stats(self) -> Dict:
+        """Get admission statistics per request class"""
+        return {name: limiter.get_stats() for name, limiter in self.limiters.items()}
+
+# Global instance
+admission_controller: Optional[AdmissionController] = None
+
+def get_admission_controller() -> AdmissionController:
+    """Get admission controller instance"""
+    global admission_controller
+    if admission_controller is None:
+        admission_controller = AdmissionController()
+    return admission_controller
@@ -1,27 +1,37 @@
 import os
 import time
 import threading
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
+from app.core.config import get_settings
 from app.core.logging_config import logger
 from app.core.exceptions import APIKeyManagerError
+from app.services.circuit_breaker import CircuitBreaker
 
 class APIKeyManager:
     """Intelligent API Key Rotation System"""
     
     def __init__(self):
+        self.settings = get_settings()
         self.api_keys: List[str] = []
         self.current_key_index = 0
         self.key_usage_count: Dict[str, int] = {}
         self.key_last_error: Dict[str, float] = {}
+        self.key_breakers: Dict[str, CircuitBreaker] = {}
         self.lock = threading.Lock()
         
         self._load_api_keys()
+        for key in self.api_keys:
+            self.key_breakers[key] = CircuitBreaker(
+                failure_threshold=self.settings.circuit_failure_threshold,
+                slow_call_threshold=self.settings.circuit_slow_call_seconds,
+                reset_timeout=self.settings.circuit_reset_seconds
+            )
         
         if not self.api_keys:
             logger.error("No valid Gemini API keys found!")
             raise APIKeyManagerError("No Gemini API keys available")
         
-        logger.info(f"🎉 Initialized with {len(self.api_keys)} API keys")
+        logger.info("🎉 Initialized with %s API keys", len(self.api_keys))
     
     def _load_api_keys(self):
         """Load all available API keys from environment"""
@@ -53,13 +63,53 @@ class APIKeyManager:
         with self.lock:
             if failed_key:
                 self.key_last_error[failed_key] = time.time()
-                logger.warning(f"🔄 API key failed, rotating. Key ending with: ...{failed_key[-4:]}")
+                logger.warning("🔄 API key failed, rotating. Key ending with: ...%s", failed_key[-4:])
             
             self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
             new_key = self.api_keys[self.current_key_index]
-            logger.info(f"✅ Rotated to API key ending with: ...{new_key[-4:]}")
+            logger.info("✅ Rotated to API key ending with: ...%s", new_key[-4:])
             return new_key
     
+    def acquire_key(self, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """Get the next key whose circuit breaker allows traffic, skipping excluded keys"""
+        exclude = exclude or set()
+        with self.lock:
+            if not self.api_keys:
+                raise APIKeyManagerError("No API keys available")
+            
+            for offset in range(len(self.api_keys)):
+                index = (self.current_key_index + offset) % len(self.api_keys)
+                key = self.api_keys[index]
+                if key in exclude or not self.key_breakers[key].allow_request():
+                    continue
+                if index != self.current_key_index and not exclude:
+                    self.current_key_index = index
+                    logger.info("⚡ Circuit open on current key, switched to key ending with: ...%s", key[-4:])
+                return key
+            
+            if exclude:
+                return None
+            # Every breaker is open, fail open on the current key rather than refusing traffic
+            return self.api_keys[self.current_key_index]
+    
+    def record_success(self, api_key: str, latency: float):
+        """Report a successful call to the key's circuit breaker"""
+        breaker = self.key_breakers.get(api_key)
+        if breaker:
+            breaker.record_success(latency)
+    
+    def record_failure(self, api_key: str):
+        """Report a failed call to the key's circuit breaker"""
+        breaker = self.key_breakers.get(api_key)
+        if breaker:
+            breaker.record_failure()
+    
+    def release_probe(self, api_key: str):
+        """Report an abandoned call to the key's circuit breaker"""
+        breaker = self.key_breakers.get(api_key)
+        if breaker:
+            breaker.release_probe()
+    
     def increment_usage(self, api_key: str):
         """Track API key usage"""
         with self.lock:
@@ -74,7 +124,8 @@ class APIKeyManager:
                 stats[f"key_{i+1}_{key_suffix}"] = {
                     "usage_count": self.key_usage_count.get(key, 0),
                     "last_error": self.key_last_error.get(key),
-                    "is_current": i == self.current_key_index
+                    "is_current": i == self.current_key_index,
+                    "circuit": self.key_breakers[key].get_stats()
                 }
             return stats
 
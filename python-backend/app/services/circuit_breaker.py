@@ -0,0 +1,69 @@
+import time
+import threading
+from typing import Dict
+
+class CircuitBreaker:
+    """Per-key circuit breaker that trips on consecutive failures or slow calls"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, slow_call_threshold: float, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trip_count = 0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Check whether traffic may be sent, letting a single probe through after cooldown"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        """Record a completed call, counting slow calls as failures"""
+        if latency >= self.slow_call_threshold:
+            self.record_failure()
+            return
+        with self.lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call and trip the breaker if needed"""
+        with self.lock:
+            self.consecutive_failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trip_count += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Give back a half-open probe whose call was abandoned without a result"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def get_stats(self) -> Dict:
+        """Get breaker statistics"""
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trip_count": self.trip_count
+            }
@@ -0,0 +1,42 @@
+from pathlib import Path
+from typing import Optional
+from chromadb.utils.embedding_functions import GoogleGenerativeAiEmbeddingFunction, ONNXMiniLM_L6_V2
+from app.core.exceptions import VectorStoreError
+from app.services.api_key_manager import APIKeyManager
+
+GOOGLE_BACKEND = "google"
+LOCAL_BACKEND = "local"
+EMBEDDING_BACKENDS = (GOOGLE_BACKEND, LOCAL_BACKEND)
+
+# Collection the Google backend has always written to, kept so existing history stays readable
+BASE_COLLECTION_NAME = "chat_history"
+
+def get_collection_name(backend: str) -> str:
+    """Get the collection that holds embeddings produced by a backend"""
+    if backend == GOOGLE_BACKEND:
+        return BASE_COLLECTION_NAME
+    # Embedding spaces differ between backends, so each gets its own collection
+    return f"{BASE_COLLECTION_NAME}_{backend}"
+
+def create_embedding_function(
+    backend: str,
+    api_key_manager: Optional[APIKeyManager] = None,
+    model_path: Optional[str] = None
+):
+    """Create the embedding function for a configured backend"""
+    if backend == GOOGLE_BACKEND:
+        if api_key_manager is None:
+            raise VectorStoreError("The google embedding backend needs an API key manager")
+        return GoogleGenerativeAiEmbeddingFunction(api_key=api_key_manager.get_current_key())
+    
+    if backend == LOCAL_BACKEND:
+        # In-process ONNX MiniLM on CPU, embeds documents in batches without a network hop.
+        # chromadb downloads the model archive on first use unless model_path already holds it
+        embedding_function = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+        if model_path:
+            embedding_function.DOWNLOAD_PATH = Path(model_path)
+        return embedding_function
+    
+    raise VectorStoreError(
+        f"Unknown embedding backend '{backend}', expected one of: {', '.join(EMBEDDING_BACKENDS)}"
+    )
@@ -1,67 +1,206 @@
 import asyncio
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable, Deque, Optional, Set
 import google.generativeai as genai
-from typing import List, Dict, Any
+import google.ai.generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
+from google.api_core.client_options import ClientOptions
+from app.core.config import get_settings
 from app.core.logging_config import logger
 from app.core.exceptions import GeminiServiceError
 from app.services.api_key_manager import get_api_key_manager
+from app.utils.profiling import profile_span
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+# Errors that say something about the key or the service behind it, as opposed to
+# the request itself (bad content, safety-blocked answers), which every key would reject
+KEY_HEALTH_ERRORS = (
+    google_exceptions.ServerError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.RetryError,
+    asyncio.TimeoutError,
+    ConnectionError
+)
+
+def create_gemini_model(api_key: str) -> genai.GenerativeModel:
+    """Create a Gemini model bound to a single API key"""
+    model = genai.GenerativeModel(MODEL_NAME)
+    # genai.configure() is process-wide, so give each model its own clients
+    # to let hedged calls run on different keys at the same time
+    client_options = ClientOptions(api_key=api_key)
+    model._client = glm.GenerativeServiceClient(client_options=client_options)
+    model._async_client = glm.GenerativeServiceAsyncClient(client_options=client_options)
+    return model
 
 class GeminiService:
-    """Gemini AI model service with retry logic"""
-    
-    def __init__(self):
-        self.model = None
+    """Gemini AI model service with retry logic, request hedging and per-key circuit breaking"""
+
+    # Number of recent latencies used to compute the hedge deadline
+    LATENCY_WINDOW = 200
+
+    def __init__(self, model_factory: Optional[Callable[[str], Any]] = None):
+        self.settings = get_settings()
         self.api_key_manager = get_api_key_manager()
+        self.model_factory = model_factory or create_gemini_model
+        self.models: Dict[str, Any] = {}
+        self.latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.generation_config = genai.GenerationConfig(
+            max_output_tokens=500,
+            temperature=0.7,
+            top_p=0.8,
+            top_k=40
+        )
         self._initialize_model()
-    
+
     def _initialize_model(self):
-        """Initialize Gemini model"""
+        """Validate that a key is available for the Gemini model"""
         try:
             current_key = self.api_key_manager.get_current_key()
-            genai.configure(api_key=current_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-            logger.info(f"🤖 Gemini model initialized with key ending: ...{current_key[-4:]}")
+            # Per-key models hold async clients, so they are built lazily on the event loop
+            logger.info("🤖 Gemini model initialized with key ending: ...%s", current_key[-4:])
         except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini model: {e}")
+            logger.error("❌ Failed to initialize Gemini model: %s", e)
             raise GeminiServiceError(f"Model initialization failed: {e}")
-    
+
+    def _get_model(self, api_key: str) -> Any:
+        """Get the cached model for an API key, creating it on first use"""
+        model = self.models.get(api_key)
+        if model is None:
+            model = self.model_factory(api_key)
+            self.models[api_key] = model
+        return model
+
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Check whether an error signals quota exhaustion"""
+        if isinstance(error, google_exceptions.TooManyRequests):
+            return True
+        # Bare "rate" would also match e.g. the safety_ratings hint on blocked responses
+        return any(keyword in str(error).lower() for keyword in ["quota", "rate limit", "resource exhausted", "429"])
+
+    def _is_key_health_error(self, error: Exception) -> bool:
+        """Check whether an error should count against the key's circuit breaker"""
+        return isinstance(error, KEY_HEALTH_ERRORS) or self._is_rate_limit_error(error)
+
+    def _hedge_delay(self) -> float:
+        """Seconds to wait for the primary call before sending a hedge"""
+        if len(self.latencies) < self.settings.hedge_min_samples:
+            return self.settings.hedge_initial_delay
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.settings.hedge_percentile))
+        return max(self.settings.hedge_min_delay, ordered[index])
+
+    async def _generate_once(self, api_key: str, content: List[Dict[str, Any]]) -> str:
+        """Run a single generation on a specific key and report the outcome"""
+        model = self._get_model(api_key)
+        start_time = time.monotonic()
+
+        try:
+            with profile_span(f"gemini_call:...{api_key[-4:]}"):
+                response = await model.generate_content_async(
+                    contents=content,
+                    generation_config=self.generation_config
+                )
+                text = response.text
+        except asyncio.CancelledError:
+            # Lost a hedge race, only count it against the key if it was already slow
+            if time.monotonic() - start_time >= self.settings.circuit_slow_call_seconds:
+                self.api_key_manager.record_failure(api_key)
+            else:
+                self.api_key_manager.release_probe(api_key)
+            raise
+        except Exception as e:
+            if self._is_key_health_error(e):
+                self.api_key_manager.record_failure(api_key)
+            else:
+                self.api_key_manager.release_probe(api_key)
+            if self._is_rate_limit_error(e) and api_key == self.api_key_manager.get_current_key():
+                logger.warning("🔄 Rate limit detected, rotating API key")
+                self.api_key_manager.rotate_key(api_key)
+            raise
+
+        latency = time.monotonic() - start_time
+        self.api_key_manager.record_success(api_key, latency)
+        self.api_key_manager.increment_usage(api_key)
+        self.latencies.append(latency)
+        return text
+
+    async def _generate_hedged(self, content: List[Dict[str, Any]], tried_keys: Set[str]) -> str:
+        """Generate on the primary key, hedging on a second key if it runs past the deadline"""
+        # Prefer keys that have not already failed this request
+        primary_key = self.api_key_manager.acquire_key(exclude=tried_keys) or self.api_key_manager.acquire_key()
+        tried_keys.add(primary_key)
+        primary = asyncio.create_task(self._generate_once(primary_key, content))
+        pending = {primary}
+
+        try:
+            if self.settings.hedging_enabled:
+                hedge_delay = self._hedge_delay()
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    hedge_key = self.api_key_manager.acquire_key(exclude=tried_keys)
+                    if hedge_key:
+                        tried_keys.add(hedge_key)
+                        logger.info(
+                            "🪁 No response after %.2fs, hedging on key ending: ...%s", hedge_delay, hedge_key[-4:]
+                        )
+                        self.hedges_sent += 1
+                        pending.add(asyncio.create_task(self._generate_once(hedge_key, content)))
+
+            last_exception = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        last_exception = task.exception()
+                    elif winner is None:
+                        winner = task
+                if winner is not None:
+                    if winner is not primary:
+                        self.hedges_won += 1
+                    return winner.result()
+            raise last_exception
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def generate_with_retry(self, content: List[Dict[str, Any]], max_retries: int = 3) -> str:
-        """Generate response with retry logic and key rotation"""
+        """Generate response with hedging, retry logic and key rotation"""
         last_exception = None
-        
+        tried_keys: Set[str] = set()
+
         for attempt in range(max_retries):
             try:
-                current_key = self.api_key_manager.get_current_key()
-                logger.info(f"🎯 Attempt {attempt + 1}/{max_retries} with key ending: ...{current_key[-4:]}")
-                
-                response = self.model.generate_content(
-                    contents=content,
-                    generation_config=genai.GenerationConfig(
-                        max_output_tokens=500,
-                        temperature=0.7,
-                        top_p=0.8,
-                        top_k=40
-                    )
-                )
-                
-                self.api_key_manager.increment_usage(current_key)
-                logger.info(f"✅ Successfully generated response")
-                return response.text
-                
+                logger.info("🎯 Attempt %s/%s", attempt + 1, max_retries)
+                response_text = await self._generate_hedged(content, tried_keys)
+                logger.info("✅ Successfully generated response")
+                return response_text
+
             except Exception as e:
-                logger.warning(f"⚠️ Attempt {attempt + 1} failed: {str(e)}")
+                logger.warning("⚠️ Attempt %s failed: %s", attempt + 1, e)
                 last_exception = e
-                
-                # Handle rate limits
-                if any(keyword in str(e).lower() for keyword in ["quota", "rate", "limit"]):
-                    logger.warning("🔄 Rate limit detected, rotating API key")
-                    new_key = self.api_key_manager.rotate_key(current_key)
-                    self._initialize_model()
-                else:
+
+                # Rate limited keys are rotated away from in _generate_once
+                if not self._is_rate_limit_error(e):
                     await asyncio.sleep(2 ** attempt)
-        
-        logger.error(f"❌ All {max_retries} attempts failed")
+
+        logger.error("❌ All %s attempts failed", max_retries)
         raise GeminiServiceError(f"Generation failed after {max_retries} attempts: {last_exception}")
 
+    def get_stats(self) -> Dict:
+        """Get generation latency and hedging statistics"""
+        return {
+            "hedge_delay": self._hedge_delay(),
+            "latency_samples": len(self.latencies),
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won
+        }
+
 # Global instance
 gemini_service: GeminiService = None
 
@@ -70,4 +209,4 @@ def get_gemini_service() -> GeminiService:
     global gemini_service
     if gemini_service is None:
         gemini_service = GeminiService()
-    return gemini_service
\ No newline at end of file
+    return gemini_service
@@ -1,13 +1,15 @@
 import asyncio
+import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from chromadb import PersistentClient
-from chromadb.utils.embedding_functions import GoogleGenerativeAiEmbeddingFunction
 from app.core.config import get_settings
 from app.core.logging_config import logger
 from app.core.exceptions import VectorStoreError
 from app.services.api_key_manager import get_api_key_manager
+from app.services.embedding_backends import LOCAL_BACKEND, create_embedding_function, get_collection_name
+from app.utils.profiling import profile_span
 
 class VectorStoreService:
     """ChromaDB vector store service"""
@@ -29,18 +31,26 @@ class VectorStoreService:
             logger.info("🗄️ ChromaDB client initialized")
             
             # Create embedding function
-            current_key = self.api_key_manager.get_current_key()
-            self.embedding_function = GoogleGenerativeAiEmbeddingFunction(api_key=current_key)
+            backend = self.settings.embedding_backend
+            self.embedding_function = create_embedding_function(
+                backend,
+                self.api_key_manager,
+                self.settings.local_embedding_model_path
+            )
+            if backend == LOCAL_BACKEND:
+                # Fetch and load the model while the service is built, which happens at startup
+                self.embedding_function(["warmup"])
+            logger.info("🧬 Using %s embedding backend", backend)
             
             # Create collection
             self.collection = self.client.get_or_create_collection(
-                name="chat_history",
+                name=get_collection_name(backend),
                 embedding_function=self.embedding_function
             )
             logger.info("✅ ChromaDB collection created successfully")
             
         except Exception as e:
-            logger.error(f"❌ Error creating ChromaDB: {e}")
+            logger.error("❌ Error creating ChromaDB: %s", e)
             raise VectorStoreError(f"Failed to initialize vector store: {e}")
     
     async def get_context_history(self, prompt: str, session_id: str) -> str:
@@ -50,7 +60,7 @@ class VectorStoreService:
             return ""
         
         try:
-            logger.debug(f"🔍 Retrieving context for session: {session_id}")
+            logger.debug("🔍 Retrieving context for session: %s", session_id)
             
             # Generate embedding for similarity search
             loop = asyncio.get_event_loop()
@@ -72,11 +82,11 @@ class VectorStoreService:
                 for doc in reversed(results['documents'][0][-2:]):
                     context_history += f"{doc}\n"
             
-            logger.debug(f"📏 Context history length: {len(context_history)}")
+            logger.debug("📏 Context history length: %s", len(context_history))
             return context_history
             
         except Exception as e:
-            logger.error(f"❌ Error querying ChromaDB: {e}")
+            logger.error("❌ Error querying ChromaDB: %s", e)
             return ""
     
     async def store_chat_history(self, prompt: str, ai_response: str, session_id: str):
@@ -85,32 +95,46 @@ class VectorStoreService:
             return
         
         try:
-            logger.debug(f"💾 Storing chat history for session: {session_id}")
+            logger.debug("💾 Storing chat history for session: %s", session_id)
             
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                lambda: self.collection.add(
-                    documents=[f"User: {prompt}\nAssistant: {ai_response}"],
-                    metadatas=[{"session_id": session_id}],
-                    ids=[str(uuid.uuid4())]
+            with profile_span("history_storage"):
+                await loop.run_in_executor(
+                    self.executor,
+                    lambda: self.collection.add(
+                        documents=[f"User: {prompt}\nAssistant: {ai_response}"],
+                        metadatas=[{"session_id": session_id}],
+                        ids=[str(uuid.uuid4())]
+                    )
                 )
-            )
             logger.debug("✅ Chat history stored successfully")
             
         except Exception as e:
-            logger.error(f"❌ Error storing chat history: {e}")
+            logger.error("❌ Error storing chat history: %s", e)
+
+# Seconds to wait after a failed initialization before trying again
+INIT_RETRY_INTERVAL = 60.0
 
 # Global instance
 vector_store: Optional[VectorStoreService] = None
+_last_init_failure: Optional[float] = None
 
 def get_vector_store() -> Optional[VectorStoreService]:
     """Get vector store instance"""
-    global vector_store
+    global vector_store, _last_init_failure
     if vector_store is None:
+        # Don't retry a failing initialization (e.g. an embedding model download) on every request
+        if _last_init_failure is not None and time.monotonic() - _last_init_failure < INIT_RETRY_INTERVAL:
+            return None
         try:
             vector_store = VectorStoreService()
+            _last_init_failure = None
         except Exception as e:
-            logger.error(f"❌ Failed to initialize vector store: {e}")
+            _last_init_failure = time.monotonic()
+            logger.error(
+                "❌ Failed to initialize vector store, chat runs without history, retrying in %.0fs: %s",
+                INIT_RETRY_INTERVAL,
+                e
+            )
             return None
     return vector_store
\ No newline at end of file
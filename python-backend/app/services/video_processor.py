@@ -4,10 +4,17 @@ import numpy as np
 import tempfile
 import os
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.core.logging_config import logger
 from app.core.exceptions import VideoProcessingError
 from app.core.config import get_settings
+from app.utils.media import MediaInfo, MediaKind, sniff_media, get_image_dimensions, count_frames
+
+# Longest side, in pixels, of frames sent to the model
+MAX_FRAME_DIMENSION = 800
+
+# Formats Gemini accepts as-is, so small uploads can skip decode and re-encode
+PASSTHROUGH_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
 
 class VideoProcessor:
     """Advanced video processing service"""
@@ -25,33 +32,49 @@ class VideoProcessor:
         fps = fps or self.settings.target_fps
         max_frames = max_frames or self.settings.max_frames
         
-        logger.info(f"🎬 Starting frame extraction, target fps: {fps}, max_frames: {max_frames}")
+        logger.info("🎬 Starting frame extraction, target fps: %s, max_frames: %s", fps, max_frames)
         start_time = time.time()
         
         try:
-            # Try in-memory processing first
-            nparr = np.frombuffer(video_bytes, np.uint8)
-            cap = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            media = sniff_media(video_bytes)
+            logger.info("🔎 Detected %s upload (%s)", media.kind, media.format_name)
+            
+            if media.kind == MediaKind.IMAGE:
+                passthrough_frame = self._passthrough_image(video_bytes, media)
+                if passthrough_frame:
+                    return [passthrough_frame]
+                image = cv2.imdecode(np.frombuffer(video_bytes, np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise VideoProcessingError(f"Could not decode {media.format_name} image")
+                return self._process_single_image(image, start_time)
+            
+            if media.kind == MediaKind.ANIMATED_IMAGE:
+                return self._extract_from_image_sequence(video_bytes, media, max_frames)
             
-            if cap is None:
+            if media.kind == MediaKind.VIDEO:
+                return self._extract_from_video_file(video_bytes, fps, max_frames, media.extension)
+            
+            # Unrecognised signature, try an image decode before the video path
+            image = cv2.imdecode(np.frombuffer(video_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
                 return self._extract_from_video_file(video_bytes, fps, max_frames)
-            else:
-                return self._process_single_image(cap, start_time)
+            return self._process_single_image(image, start_time)
                 
         except Exception as e:
-            logger.error(f"❌ Frame extraction error: {e}")
+            logger.error("❌ Frame extraction error: %s", e)
             raise VideoProcessingError(f"Failed to extract frames: {e}")
     
     def _extract_from_video_file(
         self, 
         video_bytes: bytes, 
         fps: int, 
-        max_frames: int
+        max_frames: int,
+        suffix: str = '.mp4'
     ) -> List[Dict[str, Any]]:
         """Extract frames from video file"""
         logger.info("🔄 Using temp file method for video processing")
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix or '.mp4') as tmp_file:
             tmp_file.write(video_bytes)
             tmp_path = tmp_file.name
         
@@ -66,7 +89,7 @@ class VideoProcessor:
             frame_count = 0
             extracted_count = 0
             
-            logger.info(f"📊 Video FPS: {video_fps}, frame_interval: {frame_interval}")
+            logger.info("📊 Video FPS: %s, frame_interval: %s", video_fps, frame_interval)
             
             while cap.isOpened() and extracted_count < max_frames:
                 ret, frame = cap.read()
@@ -88,6 +111,104 @@ class VideoProcessor:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
     
+    def _passthrough_image(self, image_bytes: bytes, media: MediaInfo) -> Optional[Dict[str, Any]]:
+        """Send small, web-ready images as uploaded, skipping decode and re-encode"""
+        if media.mime_type not in PASSTHROUGH_MIME_TYPES:
+            return None
+        if len(image_bytes) > self.settings.image_passthrough_max_bytes:
+            return None
+        
+        dimensions = get_image_dimensions(image_bytes, media)
+        if not dimensions or max(dimensions) > MAX_FRAME_DIMENSION:
+            return None
+        
+        logger.info("⚡ Passing %s image through without re-encoding (%sx%s)", media.format_name, *dimensions)
+        return {
+            "inline_data": {
+                "mime_type": media.mime_type,
+                "data": base64.b64encode(image_bytes).decode()
+            }
+        }
+    
+    @staticmethod
+    def _sample_indices(frame_count: int, max_frames: int) -> List[int]:
+        """Pick up to max_frames evenly spaced frame indices"""
+        if frame_count <= max_frames:
+            return list(range(frame_count))
+        step = (frame_count - 1) / max(1, max_frames - 1)
+        return sorted({round(i * step) for i in range(max_frames)})
+    
+    def _decode_sampled_pages(self, image_bytes: bytes, indices: List[int]) -> List[np.ndarray]:
+        """Decode only the given pages with imdecodemulti, one page at a time"""
+        buffer = np.frombuffer(image_bytes, np.uint8)
+        images = []
+        for index in indices:
+            # range= takes a (start, end) tuple and needs OpenCV 4.9+, older builds fall back
+            is_success, pages = cv2.imdecodemulti(buffer, cv2.IMREAD_COLOR, range=(index, index + 1))
+            if is_success and pages:
+                images.append(pages[0])
+        return images
+    
+    def _read_sampled_frames(self, image_bytes: bytes, media: MediaInfo, indices: List[int]) -> List[np.ndarray]:
+        """Stream frames through FFmpeg, keeping only the sampled ones and stopping after the last"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=media.extension) as tmp_file:
+            tmp_file.write(image_bytes)
+            tmp_path = tmp_file.name
+        
+        cap = cv2.VideoCapture(tmp_path)
+        try:
+            if not cap.isOpened():
+                return []
+            wanted = set(indices)
+            last_index = max(indices)
+            images = []
+            for frame_index in range(last_index + 1):
+                # grab() advances without copying the frame out, retrieve() only for kept frames
+                if not cap.grab():
+                    break
+                if frame_index in wanted:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        images.append(frame)
+            return images
+        finally:
+            cap.release()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def _extract_from_image_sequence(
+        self, 
+        image_bytes: bytes, 
+        media: MediaInfo, 
+        max_frames: int
+    ) -> List[Dict[str, Any]]:
+        """Extract evenly spaced frames from an animated or multi-page image"""
+        frame_count = count_frames(image_bytes, media)
+        logger.info("🎞️ Processing %s image sequence with %s frames", media.format_name, frame_count or "unknown")
+        # Without a count, sample from the start rather than decoding everything to find the end
+        indices = self._sample_indices(frame_count or max_frames, max_frames)
+        
+        images: List[np.ndarray] = []
+        if media.format_name == "tiff" and hasattr(cv2, "imdecodemulti"):
+            # TIFF pages decode independently, so seeking to a page is cheap
+            try:
+                images = self._decode_sampled_pages(image_bytes, indices)
+            except (TypeError, AttributeError, cv2.error):
+                images = []
+        # FFmpeg has no animated WebP demuxer, those fall through to their first frame
+        if not images and media.format_name != "webp":
+            images = self._read_sampled_frames(image_bytes, media, indices)
+        if not images:
+            image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            return self._process_single_image(image, time.time()) if image is not None else []
+        
+        frames = []
+        for image in images:
+            processed_frame = self._optimize_frame(image)
+            if processed_frame:
+                frames.append(processed_frame)
+        return frames
+    
     def _process_single_image(self, image: np.ndarray, start_time: float) -> List[Dict[str, Any]]:
         """Process single image"""
         logger.info("🖼️ Processing single image")
@@ -95,7 +216,7 @@ class VideoProcessor:
         processed_frame = self._optimize_frame(image)
         if processed_frame:
             extraction_time = time.time() - start_time
-            logger.info(f"✅ Processed single image in {extraction_time:.2f}s")
+            logger.info("✅ Processed single image in %.2fs", extraction_time)
             return [processed_frame]
         return []
     
@@ -104,8 +225,8 @@ class VideoProcessor:
         try:
             # Resize if too large
             height, width = frame.shape[:2]
-            if max(height, width) > 800:
-                scale = 800 / max(height, width)
+            if max(height, width) > MAX_FRAME_DIMENSION:
+                scale = MAX_FRAME_DIMENSION / max(height, width)
                 new_width = int(width * scale)
                 new_height = int(height * scale)
                 frame = cv2.resize(frame, (new_width, new_height))
@@ -122,7 +243,7 @@ class VideoProcessor:
                     }
                 }
         except Exception as e:
-            logger.error(f"❌ Frame optimization error: {e}")
+            logger.error("❌ Frame optimization error: %s", e)
         
         return None
 
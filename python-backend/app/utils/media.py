@@ -0,0 +1,229 @@
+import struct
+from typing import Optional, Tuple
+
+class MediaKind:
+    """Decoder routes for uploaded media"""
+    IMAGE = "image"
+    ANIMATED_IMAGE = "animated_image"
+    VIDEO = "video"
+    UNKNOWN = "unknown"
+
+class MediaInfo:
+    """Result of sniffing an upload's magic bytes"""
+
+    def __init__(self, kind: str, format_name: str, mime_type: Optional[str] = None, extension: str = ""):
+        self.kind = kind
+        self.format_name = format_name
+        self.mime_type = mime_type
+        self.extension = extension
+
+    def __repr__(self) -> str:
+        return f"MediaInfo(kind={self.kind!r}, format_name={self.format_name!r})"
+
+# ISO base media brands that hold still images rather than video
+_IMAGE_FTYP_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+def sniff_media(data: bytes) -> MediaInfo:
+    """Identify an upload from its leading bytes without decoding it"""
+    header = data[:32]
+
+    if header.startswith(b"\xff\xd8\xff"):
+        return MediaInfo(MediaKind.IMAGE, "jpeg", "image/jpeg", ".jpg")
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        if _is_animated_png(data):
+            return MediaInfo(MediaKind.ANIMATED_IMAGE, "apng", "image/png", ".png")
+        return MediaInfo(MediaKind.IMAGE, "png", "image/png", ".png")
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        if _is_animated_gif(data):
+            return MediaInfo(MediaKind.ANIMATED_IMAGE, "gif", "image/gif", ".gif")
+        return MediaInfo(MediaKind.IMAGE, "gif", "image/gif", ".gif")
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        if header[12:16] == b"VP8X" and len(header) > 20 and header[20] & 0x02:
+            return MediaInfo(MediaKind.ANIMATED_IMAGE, "webp", "image/webp", ".webp")
+        return MediaInfo(MediaKind.IMAGE, "webp", "image/webp", ".webp")
+    if header[:4] == b"RIFF" and header[8:12] == b"AVI ":
+        return MediaInfo(MediaKind.VIDEO, "avi", "video/x-msvideo", ".avi")
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        if _is_multipage_tiff(data):
+            return MediaInfo(MediaKind.ANIMATED_IMAGE, "tiff", "image/tiff", ".tiff")
+        return MediaInfo(MediaKind.IMAGE, "tiff", "image/tiff", ".tiff")
+    if header[:2] == b"BM":
+        return MediaInfo(MediaKind.IMAGE, "bmp", "image/bmp", ".bmp")
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        if brand in _IMAGE_FTYP_BRANDS:
+            return MediaInfo(MediaKind.IMAGE, brand.decode("ascii"), None, ".heif")
+        if brand == b"qt  ":
+            return MediaInfo(MediaKind.VIDEO, "mov", "video/quicktime", ".mov")
+        return MediaInfo(MediaKind.VIDEO, "mp4", "video/mp4", ".mp4")
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return MediaInfo(MediaKind.VIDEO, "matroska", "video/webm", ".mkv")
+    if header.startswith(b"FLV"):
+        return MediaInfo(MediaKind.VIDEO, "flv", "video/x-flv", ".flv")
+    if header.startswith(b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"):
+        return MediaInfo(MediaKind.VIDEO, "asf", "video/x-ms-wmv", ".wmv")
+    if header.startswith(b"\x00\x00\x01\xba") or header.startswith(b"\x00\x00\x01\xb3"):
+        return MediaInfo(MediaKind.VIDEO, "mpeg", "video/mpeg", ".mpg")
+    if len(data) > 188 and data[0] == 0x47 and data[188] == 0x47:
+        return MediaInfo(MediaKind.VIDEO, "mpegts", "video/mp2t", ".ts")
+
+    return MediaInfo(MediaKind.UNKNOWN, "unknown")
+
+def _is_animated_png(data: bytes) -> bool:
+    """APNG files declare an acTL chunk before the first IDAT"""
+    offset = 8
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        if chunk_type == b"acTL":
+            return True
+        if chunk_type == b"IDAT":
+            return False
+        offset += 12 + length
+    return False
+
+def _is_animated_gif(data: bytes) -> bool:
+    """More than one graphic control extension means more than one frame"""
+    first = data.find(b"\x21\xf9\x04")
+    return first != -1 and data.find(b"\x21\xf9\x04", first + 1) != -1
+
+def _is_multipage_tiff(data: bytes) -> bool:
+    """A non-zero offset after the first IFD points at another page"""
+    endian = "<" if data[:2] == b"II" else ">"
+    try:
+        (ifd_offset,) = struct.unpack(endian + "I", data[4:8])
+        (entry_count,) = struct.unpack(endian + "H", data[ifd_offset:ifd_offset + 2])
+        next_offset_at = ifd_offset + 2 + entry_count * 12
+        (next_ifd,) = struct.unpack(endian + "I", data[next_offset_at:next_offset_at + 4])
+    except struct.error:
+        return False
+    return next_ifd != 0
+
+def get_image_dimensions(data: bytes, media: MediaInfo) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from the image header without decoding pixels"""
+    try:
+        if media.format_name == "png" and len(data) >= 24:
+            return struct.unpack(">II", data[16:24])
+        if media.format_name == "webp":
+            chunk = data[12:16]
+            if chunk == b"VP8X":
+                width = int.from_bytes(data[24:27], "little") + 1
+                height = int.from_bytes(data[27:30], "little") + 1
+                return width, height
+            if chunk == b"VP8L":
+                bits = int.from_bytes(data[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", data[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+        if media.format_name == "jpeg":
+            return _jpeg_dimensions(data)
+    except struct.error:
+        pass
+    return None
+
+def _jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """Walk JPEG segments up to the first start-of-frame marker"""
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        (length,) = struct.unpack(">H", data[offset + 2:offset + 4])
+        # SOF0-SOF15, excluding DHT, JPG and DAC which share the range
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+def count_frames(data: bytes, media: MediaInfo) -> int:
+    """Count the frames or pages of an image sequence from its container metadata, 0 if unknown"""
+    try:
+        if media.format_name == "gif":
+            return _count_gif_frames(data)
+        if media.format_name == "apng":
+            return _count_apng_frames(data)
+        if media.format_name == "webp":
+            return _count_webp_frames(data)
+        if media.format_name == "tiff":
+            return _count_tiff_pages(data)
+    except (struct.error, IndexError):
+        pass
+    return 0
+
+def _skip_gif_sub_blocks(data: bytes, offset: int) -> int:
+    """Skip a chain of GIF data sub-blocks, returning the offset after its terminator"""
+    while offset < len(data):
+        size = data[offset]
+        offset += 1
+        if size == 0:
+            break
+        offset += size
+    return offset
+
+def _count_gif_frames(data: bytes) -> int:
+    """Walk GIF blocks and count image descriptors"""
+    packed = data[10]
+    offset = 13
+    if packed & 0x80:
+        offset += 3 * (2 ** ((packed & 0x07) + 1))
+
+    frames = 0
+    while offset < len(data):
+        block = data[offset]
+        if block == 0x21:
+            # Extension introducer, label, then sub-blocks
+            offset = _skip_gif_sub_blocks(data, offset + 2)
+        elif block == 0x2C:
+            frames += 1
+            packed = data[offset + 9]
+            offset += 10
+            if packed & 0x80:
+                offset += 3 * (2 ** ((packed & 0x07) + 1))
+            # Skip the LZW minimum code size byte, then the image data
+            offset = _skip_gif_sub_blocks(data, offset + 1)
+        else:
+            break
+    return frames
+
+def _count_apng_frames(data: bytes) -> int:
+    """Read num_frames from the APNG acTL chunk"""
+    offset = 8
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        if chunk_type == b"acTL":
+            return struct.unpack(">I", data[offset + 8:offset + 12])[0]
+        if chunk_type == b"IDAT":
+            break
+        offset += 12 + length
+    return 0
+
+def _count_webp_frames(data: bytes) -> int:
+    """Count ANMF chunks of an animated WebP"""
+    frames = 0
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_type = data[offset:offset + 4]
+        (size,) = struct.unpack("<I", data[offset + 4:offset + 8])
+        if chunk_type == b"ANMF":
+            frames += 1
+        offset += 8 + size + (size & 1)
+    return frames
+
+def _count_tiff_pages(data: bytes) -> int:
+    """Follow the TIFF IFD chain, guarding against cycles"""
+    endian = "<" if data[:2] == b"II" else ">"
+    (ifd_offset,) = struct.unpack(endian + "I", data[4:8])
+    seen = set()
+    while ifd_offset and ifd_offset not in seen:
+        seen.add(ifd_offset)
+        (entry_count,) = struct.unpack(endian + "H", data[ifd_offset:ifd_offset + 2])
+        next_offset_at = ifd_offset + 2 + entry_count * 12
+        (ifd_offset,) = struct.unpack(endian + "I", data[next_offset_at:next_offset_at + 4])
+    return len(seen)
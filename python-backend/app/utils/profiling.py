@@ -0,0 +1,218 @@
+import asyncio
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.core.config import get_settings
+from app.core.logging_config import logger
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]+$")
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+# cProfile hooks the whole event loop thread, so only one request may hold it at a time
+_cprofile_lock = threading.Lock()
+
+class Span:
+    """Timed section of a profiled request"""
+
+    __slots__ = ("name", "start", "end", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """Serialize the span tree with times relative to the request start"""
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((self.end - self.start) * 1000, 3) if self.end is not None else None,
+            "children": [child.to_dict(origin) for child in self.children]
+        }
+
+class _SpanContext:
+    """Context manager that records a child span on the current profile"""
+
+    __slots__ = ("profile", "name", "span", "token")
+
+    def __init__(self, profile: "RequestProfile", name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get() or self.profile.root
+        self.span = Span(self.name)
+        parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, *exc_info) -> bool:
+        self.span.end = time.perf_counter()
+        _current_span.reset(self.token)
+        return False
+
+class _NoopSpan:
+    """Span stand-in used when the request is not being profiled"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def profile_span(name: str):
+    """Time a block as a span of the current request profile, if there is one"""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NOOP_SPAN
+    return _SpanContext(profile, name)
+
+def track_background_task(task: asyncio.Task) -> asyncio.Task:
+    """Let the current request profile, if any, wait for a fire-and-forget task"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.background_tasks.append(task)
+    return task
+
+class RequestProfile:
+    """Span tree and optional cProfile capture for a single request"""
+
+    def __init__(self, method: str, path: str, forced: bool):
+        self.profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.created_at = time.time()
+        self.root = Span(f"{method} {path}")
+        self.status_code: Optional[int] = None
+        self.profiler: Optional[cProfile.Profile] = None
+        self.background_tasks: List[asyncio.Task] = []
+        self.token = None
+
+    @property
+    def duration(self) -> float:
+        end = self.root.end if self.root.end is not None else time.perf_counter()
+        return end - self.root.start
+
+    def start(self):
+        """Activate the profile for the current context and start CPU capture if free"""
+        self.token = _current_profile.set(self)
+        if _cprofile_lock.acquire(blocking=False):
+            try:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError:
+                # Another profiler (e.g. a debugger) already owns the hook
+                _cprofile_lock.release()
+
+    def stop(self, status_code: Optional[int] = None):
+        """Close the root span and stop CPU capture"""
+        self.root.end = time.perf_counter()
+        self.status_code = status_code
+        if self.profiler is not None:
+            self.profiler.disable()
+            _cprofile_lock.release()
+        if self.token is not None:
+            _current_profile.reset(self.token)
+            self.token = None
+
+    async def wait_for_background(self, timeout: float):
+        """Wait for tracked background work so its spans are closed before saving"""
+        if self.background_tasks:
+            await asyncio.wait(self.background_tasks, timeout=timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the profile for storage"""
+        cpu_profile = None
+        if self.profiler is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            cpu_profile = stream.getvalue()
+
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "forced": self.forced,
+            "created_at": self.created_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "spans": self.root.to_dict(self.root.start),
+            "cpu_profile": cpu_profile
+        }
+
+class ProfileStore:
+    """Bounded on-disk ring of request profiles"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.directory = Path(self.settings.profiling_dir)
+        self.lock = threading.Lock()
+
+    def save(self, profile: RequestProfile) -> Path:
+        """Write a profile to disk, evicting the oldest ones beyond the size limit"""
+        data = profile.to_dict()
+        with self.lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{profile.profile_id}.json"
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+            # Profile ids start with a millisecond timestamp, so name order is age order
+            stored = sorted(self.directory.glob("*.json"))
+            for old_path in stored[:max(0, len(stored) - self.settings.profiling_max_files)]:
+                try:
+                    os.unlink(old_path)
+                except OSError as e:
+                    logger.warning("⚠️ Could not evict profile %s: %s", old_path.name, e)
+
+        logger.info("🔬 Saved profile %s (%.0fms %s)", profile.profile_id, data['duration_ms'], profile.path)
+        return path
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """List stored profiles, newest first"""
+        if not self.directory.exists():
+            return []
+        profiles = []
+        with self.lock:
+            for path in sorted(self.directory.glob("*.json"), reverse=True):
+                profile_id = path.stem
+                profiles.append({
+                    "id": profile_id,
+                    "created_at": int(profile_id.split("-")[0]) / 1000,
+                    "size_bytes": path.stat().st_size
+                })
+        return profiles
+
+    def get_path(self, profile_id: str) -> Optional[Path]:
+        """Resolve a stored profile id to its file"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.json"
+        return path if path.exists() else None
+
+# Global instance
+profile_store: Optional[ProfileStore] = None
+
+def get_profile_store() -> ProfileStore:
+    """Get profile store instance"""
+    global profile_store
+    if profile_store is None:
+        profile_store = ProfileStore()
+    return profile_store
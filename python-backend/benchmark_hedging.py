@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+# The fake model never talks to Gemini, placeholder keys are enough to build the services
+os.environ.setdefault("GEMINI_API_KEY", "fake-key-0001")
+os.environ.setdefault("GEMINI_API_KEY_2", "fake-key-0002")
+
+from app.core.config import get_settings
+from app.services.gemini_service import GeminiService
+
+class FakeResponse:
+    """Stand-in for a Gemini response"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeModel:
+    """Model that answers quickly but injects occasional latency spikes"""
+
+    def __init__(self, api_key: str, base_latency: float, spike_rate: float, spike_latency: float, counter: dict):
+        self.api_key = api_key
+        self.base_latency = base_latency
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.counter = counter
+
+    async def generate_content_async(self, contents, generation_config):
+        self.counter["calls"] += 1
+        if random.random() < self.spike_rate:
+            await asyncio.sleep(self.spike_latency)
+        else:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.base_latency)
+        return FakeResponse("ok")
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run(args, hedging_enabled: bool) -> dict:
+    """Send sequential requests through GeminiService and collect latencies"""
+    settings = get_settings()
+    settings.hedging_enabled = hedging_enabled
+    counter = {"calls": 0}
+    service = GeminiService(
+        model_factory=lambda api_key: FakeModel(
+            api_key, args.base_latency, args.spike_rate, args.spike_latency, counter
+        )
+    )
+
+    latencies = []
+    for _ in range(args.requests):
+        start_time = time.monotonic()
+        await service.generate_with_retry([{"role": "user", "parts": [{"text": "ping"}]}])
+        latencies.append(time.monotonic() - start_time)
+
+    return {
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "overhead": counter["calls"] / args.requests - 1,
+        "hedges_won": service.hedges_won
+    }
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare generation tail latency with and without hedging")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--base-latency", type=float, default=0.02, help="typical call latency in seconds")
+    parser.add_argument("--spike-rate", type=float, default=0.05, help="fraction of calls that stall")
+    parser.add_argument("--spike-latency", type=float, default=1.0, help="latency of a stalled call in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    # Scale the hedge thresholds down to the simulated latencies
+    settings.hedge_initial_delay = args.spike_latency / 2
+    settings.hedge_min_delay = args.base_latency / 2
+
+    for hedging_enabled in (False, True):
+        random.seed(args.seed)
+        result = asyncio.run(run(args, hedging_enabled))
+        print(
+            f"hedging={'on ' if hedging_enabled else 'off'}  "
+            f"p50={result['p50'] * 1000:7.1f}ms  p99={result['p99'] * 1000:7.1f}ms  "
+            f"extra calls={result['overhead']:6.1%}  hedges won={result['hedges_won']}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,9 @@ def main():
         workers=1,
         loop="asyncio",
         access_log=True,
-        log_level="info"
+        log_level=settings.log_level.lower(),
+        # Keep uvicorn on the queue-based pipeline installed by setup_logging
+        log_config=None
     )
 
 if __name__ == "__main__":
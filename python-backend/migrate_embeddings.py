@@ -0,0 +1,73 @@
+import argparse
+from chromadb import PersistentClient
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging, logger
+from app.services.api_key_manager import get_api_key_manager
+from app.services.embedding_backends import (
+    EMBEDDING_BACKENDS,
+    GOOGLE_BACKEND,
+    create_embedding_function,
+    get_collection_name
+)
+
+def migrate_embeddings(source_backend: str, target_backend: str, batch_size: int, drop_source: bool):
+    """Re-embed every stored chat history document with another embedding backend"""
+    settings = get_settings()
+    client = PersistentClient(path=settings.chroma_db_path)
+
+    source_name = get_collection_name(source_backend)
+    target_name = get_collection_name(target_backend)
+    if source_name == target_name:
+        raise SystemExit("Source and target backends share a collection, nothing to migrate")
+
+    # Documents are re-embedded from their text, so the source needs no embedding function
+    source = client.get_collection(name=source_name)
+    api_key_manager = get_api_key_manager() if target_backend == GOOGLE_BACKEND else None
+    embedding_function = create_embedding_function(
+        target_backend,
+        api_key_manager,
+        settings.local_embedding_model_path
+    )
+    target = client.get_or_create_collection(name=target_name, embedding_function=embedding_function)
+
+    total = source.count()
+    logger.info("🚚 Migrating %s documents from '%s' to '%s'", total, source_name, target_name)
+
+    migrated = 0
+    while migrated < total:
+        batch = source.get(include=["documents", "metadatas"], limit=batch_size, offset=migrated)
+        if not batch["ids"]:
+            break
+
+        target.upsert(
+            ids=batch["ids"],
+            documents=batch["documents"],
+            metadatas=batch["metadatas"],
+            embeddings=embedding_function(batch["documents"])
+        )
+        migrated += len(batch["ids"])
+        logger.info("📦 Migrated %s/%s documents", migrated, total)
+
+    if drop_source:
+        client.delete_collection(name=source_name)
+        logger.info("🗑️ Dropped source collection '%s'", source_name)
+
+    logger.info("✅ Migration complete, set EMBEDDING_BACKEND=%s to use it", target_backend)
+
+def main():
+    """Command line entry point"""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Re-embed chat history with another embedding backend")
+    parser.add_argument("--source", choices=EMBEDDING_BACKENDS, default=GOOGLE_BACKEND,
+                        help="backend that produced the existing collection")
+    parser.add_argument("--target", choices=EMBEDDING_BACKENDS, default=settings.embedding_backend,
+                        help="backend to re-embed with (defaults to EMBEDDING_BACKEND)")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size)
+    parser.add_argument("--drop-source", action="store_true", help="delete the source collection afterwards")
+    args = parser.parse_args()
+
+    setup_logging()
+    migrate_embeddings(args.source, args.target, args.batch_size, args.drop_source)
+
+if __name__ == "__main__":
+    main()